@@ -0,0 +1,29 @@
+# Copyright 2026 D-Wave Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import dimod
+
+
+class TimeExactSolver:
+    params = ([10, 16, 20], [.1, 1], ['SPIN', 'BINARY'])
+    param_names = ['num_variables', 'density', 'vartype']
+
+    def setup(self, n, p, vartype):
+        self.bqm = dimod.generators.gnp_random_bqm(n, p, vartype, random_state=42)
+
+    def teardown(self, n, p, vartype):
+        del self.bqm
+
+    def time_sample(self, n, p, vartype):
+        dimod.ExactSolver().sample(self.bqm)
@@ -19,16 +19,19 @@ Note:
     These samplers are designed for use in testing. Because they calculate
     energy for every possible sample, they are very slow.
 """
-from itertools import product
+import concurrent.futures
+import os
 
 import numpy as np
 
 from dimod.binary.binary_quadratic_model import BinaryQuadraticModel
+from dimod.binary.vartypeview import VartypeView
 from dimod.constrained import ConstrainedQuadraticModel
 from dimod.core.polysampler import PolySampler
 from dimod.core.sampler import Sampler
 from dimod.discrete.discrete_quadratic_model import DiscreteQuadraticModel
 from dimod.higherorder.polynomial import BinaryPolynomial
+from dimod.reference.samplers.cyexact_solver import graycode_energies
 from dimod.sampleset import SampleSet
 from dimod.vartypes import Vartype
 
@@ -39,8 +42,10 @@ class ExactSolver(Sampler):
     """A simple exact solver for testing and debugging code using your local CPU.
 
     Notes:
-        This solver becomes slow for problems with 18 or more
-        variables.
+        This solver returns all :math:`2^n` samples for a problem with
+        :math:`n` variables, so it is limited by memory rather than by
+        the energy calculation. Problems with more than about 24
+        variables require several gigabytes.
 
     Examples:
         This example solves a two-variable Ising model.
@@ -80,12 +85,31 @@ class ExactSolver(Sampler):
         if not len(bqm.variables):
             return SampleSet.from_samples([], bqm.vartype, energy=[])
 
-        samples = _graycode(bqm)
+        if not isinstance(bqm, BinaryQuadraticModel):
+            # e.g. a BinaryPolynomial from ExactPolySolver
+            return SampleSet.from_samples_bqm((_graycode(bqm), list(bqm.variables)), bqm)
+
+        # match the variable order SampleSet.from_samples() would give
+        variables = list(bqm.variables)
+        try:
+            variables.sort()
+        except TypeError:
+            # unlike types are not sortable
+            pass
+
+        # build the record directly, writing the samples straight into it
+        record = np.empty(1 << len(variables), dtype=[('sample', np.int8, (len(variables),)),
+                                                      ('energy', np.float64),
+                                                      ('num_occurrences', int)])
+        record = record.view(np.recarray)
+        _graycode(bqm, out=record.sample)
+        record.num_occurrences = 1
 
-        if bqm.vartype is Vartype.SPIN:
-            samples = 2*samples - 1
+        # we know the order of the samples, so we can calculate the energies
+        # incrementally rather than one sample at a time
+        record.energy = _graycode_energies(bqm, variables)
 
-        return SampleSet.from_samples_bqm((samples, list(bqm.variables)), bqm)
+        return SampleSet(record, variables, {}, bqm.vartype)
 
 
 class ExactPolySolver(PolySampler):
@@ -217,6 +241,7 @@ class ExactCQMSolver():
     def sample_cqm(self, cqm: ConstrainedQuadraticModel, *,
                    rtol: float = 1e-6,
                    atol: float = 1e-8,
+                   first_feasible_only: bool = False,
                    **kwargs) -> SampleSet:
         """Sample from a constrained quadratic model.
 
@@ -230,11 +255,19 @@ class ExactCQMSolver():
             atol:
                 Absolute tolerance for constraint violations. A constant any
                 violation must be smaller than for the constraint to be satisfied.
+            first_feasible_only:
+                If True, return only the lowest-energy feasible sample. Samples
+                are checked for feasibility in order of objective energy,
+                stopping as soon as no remaining sample can have a lower
+                energy, which is much faster when low-energy samples are
+                feasible.
 
         Returns:
             A sampleset of all possible samples, with the fields ``is_feasible``
             and ``is_satisfied`` containing total and individual constraint
-            violation information, respectively.
+            violation information, respectively. If ``first_feasible_only`` is
+            True, the sampleset instead contains just the lowest-energy
+            feasible sample, or no samples if none are feasible.
 
         """
         Sampler.remove_unknown_kwargs(self, **kwargs)
@@ -244,35 +277,144 @@ class ExactCQMSolver():
 
         cases = _all_cases_cqm(cqm)
 
+        if first_feasible_only:
+            return _lowest_feasible(cases, cqm, rtol=rtol, atol=atol, **kwargs)
+
         return SampleSet.from_samples_cqm(cases, cqm, rtol=rtol, atol=atol, **kwargs)
 
 
-def _graycode(bqm):
-    """Get a numpy array containing all possible samples in a gray-code order"""
-    # developer note: there are better/faster ways to do this, but because
-    # we're limited in performance by the energy calculation, this is probably
-    # more readable and easier.
+# For each byte value, the values of its 8 bits (least significant first) as
+# int8, packed into a single 64-bit word. Expanding a bit-packed sample is then
+# a single gather per byte, with the vartype mapping folded into the table
+_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1,
+                      bitorder='little').view(np.int8)
+_BINARY_LUT = _BITS.view(np.uint64).ravel()
+_SPIN_LUT = (2*_BITS - 1).view(np.uint64).ravel()
+
+
+# The number of samples _graycode generates at a time. Small enough that the
+# intermediate arrays for each chunk stay in cache
+_GRAYCODE_CHUNK_SIZE = 1 << 14
+
+
+def _graycode(bqm, out=None):
+    """Get a numpy array containing all possible samples in a gray-code order.
+
+    The samples are given in the vartype of ``bqm``. If given, ``out`` is a
+    ``(2**n, n)`` int8 array the samples are written into. It need not be
+    contiguous.
+    """
     n = len(bqm.variables)
     ns = 1 << n
-    samples = np.empty((ns, n), dtype=np.int8)
+    num_bytes = (n + 7) // 8
+
+    if out is None:
+        out = np.empty((ns, n), dtype=np.int8)
+    lut = _SPIN_LUT if bqm.vartype is Vartype.SPIN else _BINARY_LUT
+    buff = np.empty((min(ns, _GRAYCODE_CHUNK_SIZE), num_bytes), dtype=np.uint64)
+
+    for start in range(0, ns, _GRAYCODE_CHUNK_SIZE):
+        stop = min(start + _GRAYCODE_CHUNK_SIZE, ns)
+
+        # the ith gray code is i ^ (i >> 1). Because it's less than 2**n, its
+        # little-endian bytes are already the ith sample packed in little bit
+        # order
+        idx = np.arange(start, stop, dtype=np.uint32)
+        g = (idx ^ (idx >> 1)).astype('<u4', copy=False)
+        packed_samples = g.view(np.uint8).reshape(-1, 4)[:, :num_bytes]
+
+        chunk = buff[:stop - start]
+        np.take(lut, packed_samples, out=chunk)
+        out[start:stop] = chunk.view(np.int8)[:, :n]
+
+    return out
 
-    samples[0, :] = 0
 
-    for i in range(1, ns):
-        v = (i & -i).bit_length() - 1  # the least significant set bit of i
-        samples[i, :] = samples[i - 1, :]
-        samples[i, v] = not samples[i - 1, v]
+# The number of samples in each of the tasks _graycode_energies spreads over its
+# threads. A multiple of the kernel's block_size, so that every task starts from
+# an energy calculated from scratch and the split does not change the energies
+_GRAYCODE_BLOCK_SIZE = 1 << 16
 
-    return samples
+
+def _graycode_energies(bqm, variables, num_threads=None):
+    """Get a numpy array containing the energies of the samples from
+    :func:`_graycode`, in the same order, with the columns of the samples
+    corresponding to ``variables``.
+
+    The samples are split into fixed-size blocks that are calculated
+    concurrently by up to ``num_threads`` threads, defaulting to the number of
+    CPUs. The energies do not depend on the number of threads.
+    """
+    # developer note: the energies are accumulated in float64 regardless of
+    # the bqm's dtype. Each energy builds on the previous one, so rounding
+    # error compounds until the kernel next calculates an energy from scratch,
+    # which it does at the start of every block of samples. For the same
+    # reason the biases should not be quantized to a smaller integer type.
+
+    if isinstance(bqm.data, VartypeView):
+        # views convert their biases on the fly, rounding them to the model's
+        # dtype, so use the underlying model like bqm.energies() does. The
+        # samples are in the same order for either vartype
+        bqm = bqm.spin if bqm.vartype is Vartype.BINARY else bqm.binary
+
+    ldata, (irow, icol, qdata), offset = bqm.to_numpy_vectors(variables)
+
+    # each variable's neighbors and biases, in CSR format. Each interaction
+    # appears in the rows of both of its variables, and the neighbors are sorted
+    # so that the kernel walks through the fields in order
+    rows = np.concatenate((irow, icol))
+    cols = np.concatenate((icol, irow))
+    order = np.lexsort((cols, rows))
+
+    indptr = np.zeros(len(variables) + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=len(variables)), out=indptr[1:])
+
+    args = (np.asarray(ldata, dtype=np.float64),
+            indptr,
+            cols[order].astype(np.int32, copy=False),
+            np.concatenate((qdata, qdata))[order].astype(np.float64, copy=False),
+            offset,
+            bqm.vartype is Vartype.SPIN)
+
+    energies = np.empty(1 << len(variables), dtype=np.float64)
+
+    if num_threads is None:
+        num_threads = os.cpu_count() or 1
+    starts = range(0, len(energies), _GRAYCODE_BLOCK_SIZE)
+    num_threads = min(num_threads, len(starts))
+
+    if num_threads <= 1:
+        # the kernel anchors at the same samples whether it is given the blocks
+        # one at a time or all at once
+        graycode_energies(*args, energies)
+        return energies
+
+    # each block starts from the energy of its own first sample, and the
+    # kernel releases the GIL, so the blocks can be calculated in parallel
+    with concurrent.futures.ThreadPoolExecutor(num_threads) as executor:
+        futures = [executor.submit(graycode_energies, *args,
+                                   energies[start:start + _GRAYCODE_BLOCK_SIZE], start)
+                   for start in starts]
+        for future in futures:
+            future.result()  # raise any exceptions
+
+    return energies
 
 
 def _all_cases_dqm(dqm):
     """Get a numpy array containing all possible samples as lists of integers"""
-    # developer note: there may be better ways to do this, but because we're
-    # limited in performance by the energy calculation, this is probably fine
+    num_cases = [dqm.num_cases(v) for v in dqm.variables]
+    num_variables = len(num_cases)
+
+    # write each variable's cases directly into its column by broadcasting
+    # over an n-dimensional view of the output, rather than building a meshgrid
+    cases = np.empty((*num_cases, num_variables), dtype=np.int32)
+    for vi, k in enumerate(num_cases):
+        shape = [1] * num_variables
+        shape[vi] = k
+        cases[..., vi] = np.arange(k, dtype=np.int32).reshape(shape)
 
-    cases = [range(dqm.num_cases(v)) for v in dqm.variables]
-    return np.array(np.meshgrid(*cases)).T.reshape(-1,dqm.num_variables()), list(dqm.variables)
+    return cases.reshape(-1, num_variables), list(dqm.variables)
 
 
 def _all_cases_cqm(cqm):
@@ -288,44 +430,90 @@ def _all_cases_cqm(cqm):
     s = set(d_vars)
     var_list = [v for v in var_list if v not in s]
 
+    # Use the smallest signed integer type that can hold every variable's values.
+    # Only integer variables can be outside of [-1, 1]. Other vartypes are left
+    # to _iterator_by_vartype to accept or reject
+    max_ = max((max(-cqm.lower_bound(v), cqm.upper_bound(v)) for v in var_list
+                if cqm.vartype(v) is Vartype.INTEGER), default=1)
+    try:
+        dtype = next(tp for tp in (np.int8, np.int16, np.int32, np.int64)
+                     if max_ <= np.iinfo(tp).max)
+    except StopIteration:
+        raise ValueError("variable bounds do not fit in np.int64")
+
     # Construct all combinations of spin, integer, and binary variables not included in discrete
-    cases = [_iterator_by_vartype(cqm, v) for v in var_list]
-    c1 = np.array(np.meshgrid(*cases))
+    cases = [_iterator_by_vartype(cqm, v, dtype) for v in var_list]
+    c1 = np.array(np.meshgrid(*cases), dtype=dtype)
     if len(var_list):
         c1 = c1.T.reshape(-1,len(var_list))
 
-    # Concatenate each discrete variable cases with each non-discrete variable cases
-    combinations = []
-    for indexes in product(*[range(d) for d in d_cases]):
-        if not len(indexes):
-            break
+    var_list = d_vars + var_list
+
+    # If there are no discrete variables, we're done
+    if not d_cases:
+        return c1, var_list
 
-        l = []
-        for i in range(len(indexes)):
-            s = np.zeros(d_cases[i])
-            s[indexes[i]] = 1
-            l = np.concatenate([l, s])
+    # Build every combination in place, by broadcasting over a view of the
+    # output with one axis per discrete variable and a final axis for the cases
+    # of the other variables. Each discrete variable's cases are the rows of
+    # its identity matrix
+    c1 = c1.reshape(max(len(c1), 1), -1)
+    offsets = np.cumsum([0] + d_cases)
 
-        if len(c1):
-            for row in c1:
-                combinations.append(np.concatenate([l, row]))
-        else:
-            combinations.append(l)
+    combinations = np.empty((*d_cases, len(c1), len(var_list)), dtype=dtype)
+    for i, d in enumerate(d_cases):
+        shape = [1] * (len(d_cases) + 1) + [d]
+        shape[i] = d
+        combinations[..., offsets[i]:offsets[i + 1]] = np.eye(d, dtype=dtype).reshape(shape)
+    combinations[..., offsets[-1]:] = c1
 
-    var_list = d_vars + var_list
+    return combinations.reshape(-1, len(var_list)), var_list
+
+
+# The number of samples checked for feasibility in the first block by
+# _lowest_feasible. Each subsequent block is twice the size of the previous one
+_FEASIBLE_BLOCK_SIZE = 1 << 6
+
+
+def _lowest_feasible(cases, cqm, **kwargs):
+    """Get a sample set with the lowest-energy feasible sample of ``cases``"""
+    samples, labels = cases
+
+    objective = cqm.objective.energies((samples, labels))
+    order = np.argsort(objective, kind='stable')
+
+    # soft constraint penalties are non-negative, so the energy of a sample is
+    # never less than its objective energy. That lets us stop checking as soon
+    # as the remaining objective energies reach the best energy found
+    best = None
+    best_energy = np.inf
+    start = 0
+    size = _FEASIBLE_BLOCK_SIZE
+    while start < len(order) and objective[order[start]] < best_energy:
+        block = order[start:start + size]
+
+        record = SampleSet.from_samples_cqm(
+            (samples[block], labels), cqm, **kwargs).record
+
+        feasible = np.flatnonzero(record.is_feasible)
+        if len(feasible):
+            i = feasible[np.argmin(record.energy[feasible])]
+            if record.energy[i] < best_energy:
+                best = block[i]
+                best_energy = record.energy[i]
 
-    # If nothing was added to combinations, then there are no discrete variables
-    if not len(combinations):
-        combinations = c1
+        start += size
+        size *= 2
 
-    return np.array(combinations), var_list
+    rows = [] if best is None else [best]
+    return SampleSet.from_samples_cqm((samples[rows], labels), cqm, **kwargs)
 
 
-def _iterator_by_vartype(cqm, v):
+def _iterator_by_vartype(cqm, v, dtype=np.int64):
     if cqm.vartype(v) is Vartype.BINARY:
-        return range(2)
+        return np.arange(2, dtype=dtype)
     if cqm.vartype(v) is Vartype.SPIN:
-        return [-1, 1]
+        return np.array([-1, 1], dtype=dtype)
     if cqm.vartype(v) is Vartype.INTEGER:
-        return range(int(cqm.lower_bound(v)), int(cqm.upper_bound(v)+1))
+        return np.arange(int(cqm.lower_bound(v)), int(cqm.upper_bound(v)+1), dtype=dtype)
     raise ValueError("Only Binary, Spin, or Integer variables supported by ExactCQMSolver")
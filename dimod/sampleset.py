@@ -590,6 +590,104 @@ def keep_variables(sampleset: 'SampleSet', variables: Iterable[Variable]) -> 'Sa
                          'not present in the sampleset')
 
 
+# The maximum number of entries in each of the intermediate arrays used to
+# evaluate the linear constraints in _iter_lhs_energies
+_LHS_BLOCK_SIZE = 1 << 20
+
+
+def _iter_lhs_energies(samples: np.ndarray, labels: Variables, cqm) -> typing.Iterator[np.ndarray]:
+    """Yield the energies of the left-hand side of each constraint in ``cqm``.
+
+    Runs of consecutive linear constraints are evaluated together rather than
+    one constraint at a time. Sparse runs gather the samples' values for all
+    of their terms at once and sum each constraint's terms, so the cost is
+    proportional to the number of terms. Dense runs use a single matrix
+    product of the samples with the constraints' biases.
+    """
+    num_samples, num_variables = samples.shape
+
+    constraints = list(cqm.constraints.values())
+
+    # the column in samples of each of the cqm's variables, or -1 if missing
+    columns = None
+
+    # the most constraints (rows) and terms evaluated together
+    max_rows = max(_LHS_BLOCK_SIZE // max(num_samples, 1), 1)
+    max_terms = _LHS_BLOCK_SIZE
+
+    i = 0
+    while i < len(constraints):
+        if not constraints[i].lhs.is_linear():
+            yield constraints[i].lhs.energies((samples, labels))
+            i += 1
+            continue
+
+        if columns is None:
+            if labels == cqm.variables:
+                columns = np.arange(num_variables)
+            else:
+                columns = np.fromiter((labels.index(v) if v in labels else -1
+                                       for v in cqm.variables),
+                                      dtype=np.intp, count=len(cqm.variables))
+
+        # the run of linear constraints to evaluate together, in CSR format
+        run = []
+        indptr = [0]
+        indices = []
+        data = []
+        offsets = []
+        while len(run) < max_rows and indptr[-1] < max_terms:
+            lhs = constraints[i].lhs
+
+            cols = lhs._iindices()
+            indptr.append(indptr[-1] + len(cols))
+            indices.append(cols)
+            data.append(lhs._ilinear())
+            offsets.append(lhs.offset)
+            run.append(lhs)
+
+            i += 1
+            if i == len(constraints) or not constraints[i].lhs.is_linear():
+                break
+
+        indptr = np.asarray(indptr)
+        indices = columns[np.concatenate(indices)]
+        data = np.concatenate(data).astype(np.float64, copy=False)
+
+        if (indices < 0).any():
+            # let .energies() raise the appropriate error
+            for lhs in run:
+                lhs.energies((samples, labels))
+
+        energies = np.empty((num_samples, len(offsets)), dtype=np.float64)
+        energies[:] = offsets
+
+        if 4 * len(indices) >= len(offsets) * num_variables:
+            # the constraints are dense enough that a matrix product of the
+            # samples with their dense biases is the faster way
+            biases = np.zeros((len(offsets), num_variables), dtype=np.float64)
+            biases[np.repeat(np.arange(len(offsets)), np.diff(indptr)), indices] = data
+
+            max_samples = max(_LHS_BLOCK_SIZE // max(num_variables, 1), 1)
+            for begin in range(0, num_samples, max_samples):
+                end = min(begin + max_samples, num_samples)
+                energies[begin:end] += samples[begin:end].astype(np.float64) @ biases.T
+        else:
+            # np.add.reduceat() needs strictly increasing starts, so leave out
+            # the constraints without any terms. Their energy is their offset
+            nonempty = np.flatnonzero(np.diff(indptr))
+
+            if len(nonempty):
+                max_samples = max(_LHS_BLOCK_SIZE // len(indices), 1)
+                for begin in range(0, num_samples, max_samples):
+                    end = min(begin + max_samples, num_samples)
+                    terms = samples[begin:end, indices] * data
+                    energies[begin:end, nonempty] += np.add.reduceat(
+                        terms, indptr[nonempty], axis=1)
+
+        yield from energies.T
+
+
 class SampleSet(abc.Iterable, abc.Sized):
     """Samples and any other data returned by dimod samplers.
 
@@ -748,7 +846,9 @@ class SampleSet(abc.Iterable, abc.Sized):
             vectors[key] = vector = np.asarray(vector)
             datatypes.append((key, vector.dtype, vector.shape[1:]))
 
-        record = np.rec.array(np.zeros(num_samples, dtype=datatypes))
+        # every field is assigned below, so there's no need to zero the array,
+        # and viewing it as a recarray avoids the copy made by np.rec.array
+        record = np.empty(num_samples, dtype=datatypes).view(np.recarray)
         record['sample'] = samples
         record['energy'] = energy
         record['num_occurrences'] = num_occurrences
@@ -886,10 +986,10 @@ class SampleSet(abc.Iterable, abc.Sized):
         constraint_labels = []
         is_satisfied = np.empty((samples.shape[0], len(cqm.constraints)), dtype=bool)
         soft = set()
-        for i, (label, comparison) in enumerate(cqm.constraints.items()):
+        lhs_energies = _iter_lhs_energies(samples, labels, cqm)
+        for i, ((label, comparison), lhs) in enumerate(zip(cqm.constraints.items(), lhs_energies)):
             constraint_labels.append(label)
 
-            lhs = comparison.lhs.energies(samples_like)
             rhs = comparison.rhs
             sense = comparison.sense
             if sense is Sense.Eq:
@@ -903,7 +1003,13 @@ class SampleSet(abc.Iterable, abc.Sized):
 
             is_satisfied[:, i] = violation <= atol + rtol*abs(rhs)
 
-            if comparison.lhs.is_soft() and not is_satisfied.all():
+            if comparison.lhs.is_soft():
+                soft.add(label)
+
+                # no penalty to apply if every sample satisfies this constraint
+                if is_satisfied[:, i].all():
+                    continue
+
                 weight = comparison.lhs.weight()
                 penalty = comparison.lhs.penalty()
 
@@ -914,8 +1020,6 @@ class SampleSet(abc.Iterable, abc.Sized):
                 else:
                     raise RuntimeError("unexpected penalty")
 
-                soft.add(label)
-
         if soft:
             hard = [i for i, label in enumerate(constraint_labels) if label not in soft]
             is_feasible = is_satisfied[:, hard].all(axis=1)
@@ -68,6 +68,7 @@ setup(
          'dimod/cyqmbase/*.pyx',
          'dimod/discrete/cydiscrete_quadratic_model.pyx',
          'dimod/quadratic/cyqm/*.pyx',
+         'dimod/reference/samplers/*.pyx',
          'dimod/*.pyx',
          ],
         annotate=True,
@@ -95,6 +95,43 @@ class TestExactSolver(unittest.TestCase):
 
         dimod.testing.assert_response_energies(response, bqm)
 
+    def test_graycode_order(self):
+        bqm = dimod.BinaryQuadraticModel.from_ising({v: 1 for v in range(10)}, {})
+
+        samples = dimod.ExactSolver().sample(bqm).record.sample
+
+        self.assertEqual(len(np.unique(samples, axis=0)), 2**10)
+        npt.assert_array_equal(samples[0], -1)
+
+        # successive samples differ by exactly one variable
+        npt.assert_array_equal((samples[1:] != samples[:-1]).sum(axis=1), 1)
+
+    def test_energies(self):
+        for vartype in [dimod.SPIN, dimod.BINARY]:
+            for dtype in [np.float32, np.float64]:
+                with self.subTest(vartype=vartype, dtype=dtype):
+                    # enough variables for the energies to be re-anchored
+                    # several times along the Gray code
+                    bqm = dimod.generators.gnp_random_bqm(16, .5, vartype, random_state=5)
+                    bqm = dimod.BinaryQuadraticModel(bqm, dtype=dtype)
+                    bqm.offset = -1.5
+
+                    sampleset = dimod.ExactSolver().sample(bqm)
+
+                    self.assertEqual(sampleset.record.energy.dtype, np.float64)
+                    npt.assert_allclose(sampleset.record.energy,
+                                        bqm.energies((sampleset.record.sample,
+                                                      sampleset.variables)),
+                                        rtol=0, atol=5e-13)
+
+                    # views of the other vartype are solved via the underlying model
+                    view = bqm.binary if vartype is dimod.SPIN else bqm.spin
+                    sampleset = dimod.ExactSolver().sample(view)
+                    npt.assert_allclose(sampleset.record.energy,
+                                        view.energies((sampleset.record.sample,
+                                                       sampleset.variables)),
+                                        rtol=0, atol=5e-13)
+
     def test_sample_DISCRETE(self):
         dqm = dimod.DiscreteQuadraticModel.from_numpy_vectors(
                         case_starts =   [0, 3],
@@ -196,7 +233,56 @@ class TestExactSolver(unittest.TestCase):
         self.assertEqual(len(feasible_responses), 18)
         
         dimod.testing.assert_sampleset_energies_cqm(response, cqm)
-        
+
+    def test_sample_CONSTRAINED_dtype(self):
+        cqm = dimod.ConstrainedQuadraticModel()
+        x, s = dimod.Binary('x'), dimod.Spin('s')
+        cqm.add_discrete('abc', label='d')
+        cqm.set_objective(x + s)
+
+        response = dimod.ExactCQMSolver().sample_cqm(cqm)
+        self.assertEqual(response.record.sample.dtype, np.int8)
+        self.assertEqual(len(response), 12)
+
+        i = dimod.Integer('i', lower_bound=-200, upper_bound=-198)
+        cqm.set_objective(x + s + i)
+
+        response = dimod.ExactCQMSolver().sample_cqm(cqm)
+        self.assertEqual(response.record.sample.dtype, np.int16)
+        self.assertEqual(len(response), 36)
+        dimod.testing.assert_sampleset_energies_cqm(response, cqm)
+
+    def test_sample_CONSTRAINED_unsupported_vartype(self):
+        cqm = dimod.ConstrainedQuadraticModel()
+        cqm.set_objective(dimod.Binary('x') + dimod.Real('r'))
+
+        with self.assertRaisesRegex(ValueError, "Only Binary, Spin, or Integer variables"):
+            dimod.ExactCQMSolver().sample_cqm(cqm)
+
+    def test_sample_CONSTRAINED_first_feasible_only(self):
+        rng = np.random.default_rng(42)
+
+        cqm = dimod.ConstrainedQuadraticModel()
+        x = [dimod.Binary(v) for v in range(12)]
+        i = dimod.Integer('i', upper_bound=3)
+        cqm.set_objective(dimod.quicksum(rng.normal() * v for v in x) - i)
+        cqm.add_constraint(dimod.quicksum(x) + i >= 8, label='hard')
+        cqm.add_constraint(x[0] + x[1] <= 0, label='soft', weight=2)
+
+        response = dimod.ExactCQMSolver().sample_cqm(cqm)
+        lowest = response.filter(lambda d: d.is_feasible).first
+
+        sampleset = dimod.ExactCQMSolver().sample_cqm(cqm, first_feasible_only=True)
+        self.assertEqual(len(sampleset), 1)
+        self.assertTrue(sampleset.first.is_feasible)
+        self.assertAlmostEqual(sampleset.first.energy, lowest.energy)
+        dimod.testing.assert_sampleset_energies_cqm(sampleset, cqm)
+
+        with self.subTest('infeasible'):
+            cqm.add_constraint(i >= 4, label='infeasible')
+            sampleset = dimod.ExactCQMSolver().sample_cqm(cqm, first_feasible_only=True)
+            self.assertEqual(len(sampleset), 0)
+            self.assertEqual(set(sampleset.variables), set(cqm.variables))
 
     def test_sample_ising(self):
         h = {0: 0.0, 1: 0.0, 2: 0.0}
@@ -280,6 +366,43 @@ class TestExactSolver(unittest.TestCase):
         with self.assertWarns(SamplerUnknownArgWarning):
             sampleset = dimod.ExactCQMSolver().sample_cqm(cqm, a=1, b="abc")
 
+
+class TestGraycodeEnergies(unittest.TestCase):
+    def test_blocks(self):
+        from dimod.reference.samplers.cyexact_solver import graycode_energies
+        from dimod.reference.samplers.exact_solver import _graycode, _graycode_energies
+
+        for vartype in [dimod.SPIN, dimod.BINARY]:
+            with self.subTest(vartype=vartype):
+                bqm = dimod.generators.gnp_random_bqm(18, .25, vartype, random_state=7)
+                variables = list(bqm.variables)
+
+                energies = bqm.energies((_graycode(bqm), variables))
+
+                serial = _graycode_energies(bqm, variables, num_threads=1)
+                npt.assert_allclose(serial, energies)
+
+                # the blocks don't depend on the number of threads
+                npt.assert_array_equal(_graycode_energies(bqm, variables, num_threads=3), serial)
+                npt.assert_array_equal(_graycode_energies(bqm, variables, num_threads=100), serial)
+
+                # a block can start anywhere
+                (ldata, (irow, icol, qdata), offset) = bqm.to_numpy_vectors(variables)
+                dense = np.zeros((len(bqm), len(bqm)))
+                dense[irow, icol] = dense[icol, irow] = qdata
+                rows, cols = np.nonzero(dense)
+                indptr = np.searchsorted(rows, np.arange(len(bqm) + 1)).astype(np.int32)
+
+                out = np.empty(1000)
+                graycode_energies(ldata, indptr, cols.astype(np.int32), dense[rows, cols],
+                                  offset, vartype is dimod.SPIN, out, 12345)
+                npt.assert_allclose(out, energies[12345:13345])
+
+                with self.assertRaises(ValueError):
+                    graycode_energies(ldata, indptr, cols.astype(np.int32), dense[rows, cols],
+                                      offset, vartype is dimod.SPIN, out, 2**18 - 10)
+
+
 class TestExactPolySolver(unittest.TestCase):
     def test_instantiation(self):
         sampler = dimod.ExactPolySolver()
@@ -18,6 +18,7 @@ import fractions
 import json
 import pickle
 import unittest
+import unittest.mock
 
 from collections import OrderedDict
 
@@ -354,6 +355,67 @@ class TestConstruction(unittest.TestCase):
         self.assertEqual(sampleset.record.is_feasible.dtype, np.dtype(bool))
         self.assertEqual(sampleset.record.is_satisfied.shape, (0, 0))
 
+    def test_from_samples_cqm_mixed_constraints(self):
+        cqm = dimod.ConstrainedQuadraticModel()
+        i, j = dimod.Integers('ij')
+        x, y = dimod.Binaries('xy')
+        cqm.set_objective(i + x*y)
+        cqm.add_constraint(i + 2*j - x <= 3, label='c0')
+        cqm.add_constraint(j - 4*y >= -1.5, label='c1')
+        cqm.add_constraint(i*x + y <= 1, label='c2')
+        cqm.add_constraint(i - j == 0, label='c3')
+
+        samples = ([[0, 1, 0, 1], [1, 1, 1, 0], [2, 0, 1, 1]], 'ijxy')
+        sampleset = dimod.SampleSet.from_samples_cqm(samples, cqm)
+
+        np.testing.assert_array_equal(sampleset.record.is_satisfied,
+                                      [[True, False, True, False],
+                                       [True, True, True, True],
+                                       [True, False, False, False]])
+        np.testing.assert_array_equal(sampleset.record.is_feasible, [False, True, False])
+
+        with self.assertRaises(ValueError):
+            dimod.SampleSet.from_samples_cqm(([[0, 1, 0]], 'ijx'), cqm)
+
+    def test_from_samples_cqm_blocks(self):
+        rng = np.random.default_rng(7)
+
+        cqm = dimod.ConstrainedQuadraticModel()
+        x = [dimod.Binary(v) for v in range(20)]
+        i = dimod.Integer('i', upper_bound=5)
+        for c in range(15):
+            if c % 5 == 4:
+                cqm.add_constraint(x[c] * i + x[0] <= 3, label=c)
+            elif c % 5 == 3:
+                cqm.add_constraint_from_model(dimod.QM(), '<=', 1, label=c)
+            else:
+                # the first run of linear constraints is dense, the others sparse
+                terms = rng.choice(20, size=20 if c == 0 else 2, replace=False)
+                cqm.add_constraint(dimod.quicksum(rng.normal() * x[v] for v in terms) + i >= 0,
+                                   label=c)
+
+        samples = (rng.integers(0, 2, size=(50, 21)), list(range(20)) + ['i'])
+        samples[0][:, -1] = rng.integers(0, 6, size=50)
+
+        expected = dimod.SampleSet.from_samples_cqm(samples, cqm)
+
+        for block_size in [1, 2, 3, 20, 50, 1000]:
+            with self.subTest(block_size=block_size):
+                with unittest.mock.patch('dimod.sampleset._LHS_BLOCK_SIZE', block_size):
+                    sampleset = dimod.SampleSet.from_samples_cqm(samples, cqm)
+
+                    arr, labels = dimod.as_samples(samples, labels_type=dimod.variables.Variables)
+                    energies = list(dimod.sampleset._iter_lhs_energies(arr, labels, cqm))
+
+                np.testing.assert_array_equal(sampleset.record.is_satisfied,
+                                              expected.record.is_satisfied)
+                np.testing.assert_allclose(sampleset.record.energy, expected.record.energy)
+
+                self.assertEqual(len(energies), len(cqm.constraints))
+                for lhs, comparison in zip(energies, cqm.constraints.values()):
+                    np.testing.assert_allclose(lhs, comparison.lhs.energies(samples),
+                                               rtol=1e-12, atol=1e-12)
+
     def test_from_samples_cqm_soft(self):
         cqm = dimod.ConstrainedQuadraticModel()
         x, y = dimod.Binaries('xy')